@@ -1,38 +1,59 @@
 #!/usr/bin/env python3
 """
 Helper script to add recipe URLs to recipe_urls.json.
-Usage: python3 add_recipe_url.py "Recipe Title" "https://example.com/recipe"
+Usage: python3 add_recipe_url.py "Recipe Title" "https://example.com/recipe" ["Title 2" "URL 2" ...]
+       python3 add_recipe_url.py - < urls.json   (JSON object of title -> URL on stdin)
 """
 
-import json
+import orjson
 import sys
-import os
+from json_files import read_json, write_json
 
-def add_recipe_url(title, url, recipe_urls_file='recipe_urls.json'):
-    """Add or update a recipe URL."""
+def add_recipe_urls(title_url_pairs, recipe_urls_file='recipe_urls.json'):
+    """Add or update several recipe URLs, reading and writing the file once."""
     # Load existing URLs
-    if os.path.exists(recipe_urls_file):
-        with open(recipe_urls_file, 'r') as f:
-            recipes = json.load(f)
-    else:
+    try:
+        recipes = read_json(recipe_urls_file)
+    except FileNotFoundError:
         recipes = {}
     
-    # Update or add the URL
-    recipes[title] = url
+    # Update or add the URLs
+    title_url_pairs = list(title_url_pairs)
+    for title, url in title_url_pairs:
+        recipes[title] = url
     
     # Write back
-    with open(recipe_urls_file, 'w') as f:
-        json.dump(recipes, f, indent=2)
+    write_json(recipe_urls_file, recipes)
     
-    print(f"Added/Updated: {title} -> {url}")
+    for title, url in title_url_pairs:
+        print(f"Added/Updated: {title} -> {url}")
     return recipes
 
+def add_recipe_url(title, url, recipe_urls_file='recipe_urls.json'):
+    """Add or update a recipe URL."""
+    return add_recipe_urls([(title, url)], recipe_urls_file)
+
 if __name__ == '__main__':
-    if len(sys.argv) != 3:
-        print("Usage: python3 add_recipe_url.py \"Recipe Title\" \"https://example.com/recipe\"")
+    if sys.argv[1:] == ['-']:
+        try:
+            urls = orjson.loads(sys.stdin.buffer.read())
+        except orjson.JSONDecodeError as e:
+            print(f"Error: stdin is not valid JSON: {e}")
+            sys.exit(1)
+        if not isinstance(urls, dict):
+            print("Error: stdin must be a JSON object of title -> URL")
+            sys.exit(1)
+        for title, url in urls.items():
+            if not (isinstance(title, str) and title and isinstance(url, str) and url):
+                print(f"Error: title and URL must be non-empty strings: {title!r} -> {url!r}")
+                sys.exit(1)
+        add_recipe_urls(urls.items())
+        sys.exit(0)
+    
+    if len(sys.argv) < 3 or len(sys.argv) % 2 == 0:
+        print("Usage: python3 add_recipe_url.py \"Recipe Title\" \"https://example.com/recipe\" [\"Title 2\" \"URL 2\" ...]")
+        print("       python3 add_recipe_url.py - < urls.json")
         sys.exit(1)
     
-    title = sys.argv[1]
-    url = sys.argv[2]
-    add_recipe_url(title, url)
-
+    args = sys.argv[1:]
+    add_recipe_urls(zip(args[::2], args[1::2]))
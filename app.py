@@ -4,55 +4,104 @@ Flask web application for recipe management.
 """
 
 from flask import Flask, render_template, jsonify
+from flask.json.provider import JSONProvider
 from recipe_parser import RecipeParser
+import functools
+import orjson
 import os
+import threading
+import time
+from urllib.parse import unquote
+
+
+class ORJSONProvider(JSONProvider):
+    """Serialize JSON responses with orjson instead of the stdlib json module."""
+
+    def dumps(self, obj, **kwargs):
+        # Sorted keys match Flask's default provider
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 
 # Document IDs
 DOC_ID = '1ZKRBHoqKoQQ7RcnHoNtLtx0O0ae7ZMHF_XF1UUNp2kY'
 QUICK_RECIPE_DOC_ID = '1BpJj3ECDU2Z_QYcorncs3SbeiKUD_WI_Lj29hnRjI18'
 
-# Cache recipes
-recipes_cache = None
+# Re-fetch recipes from Google Docs once the cache is older than this (seconds)
+RECIPES_TTL = 15 * 60
+
+# When each (doc_id, quick_recipe_doc_id) pair was last loaded
+_load_ts = {}
+
+# Serializes cache misses so concurrent requests don't each parse the docs
+_cache_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _load(doc_id, quick_recipe_doc_id):
+    """
+    Parse recipes from Google Docs (cached until clear_cache is called).
+    Returns: (recipes, sorted_recipes, sorted_titles, title_index), built together
+    so the derived views always match the recipes they came from
+    """
+    _load_ts[(doc_id, quick_recipe_doc_id)] = time.monotonic()
+    parser = RecipeParser(doc_id, quick_recipe_doc_id)
+    recipes = parser.parse()
+    
+    # Alphabetical by title
+    sorted_recipes = sorted(recipes, key=lambda x: x['title'].lower())
+    sorted_titles = [recipe['title'] for recipe in sorted_recipes]
+    
+    # Keyed by lowercase title, keeping the first recipe when titles only differ by case
+    title_index = {}
+    for recipe in recipes:
+        title_index.setdefault(recipe['title'].lower(), recipe)
+    
+    return recipes, sorted_recipes, sorted_titles, title_index
 
 
 def clear_cache():
     """Clear the recipes cache so data is re-fetched from Google Docs."""
-    global recipes_cache
-    recipes_cache = None
+    with _cache_lock:
+        _load.cache_clear()
+
+
+def _recipe_data():
+    """Cached result of _load, re-fetched once it is older than RECIPES_TTL."""
+    # lru_cache alone lets two threads that miss at the same time both run the
+    # parse; under the lock the second one waits and then gets the cached result
+    with _cache_lock:
+        loaded_at = _load_ts.get((DOC_ID, QUICK_RECIPE_DOC_ID))
+        if loaded_at is not None and time.monotonic() - loaded_at > RECIPES_TTL:
+            _load.cache_clear()
+        return _load(DOC_ID, QUICK_RECIPE_DOC_ID)
 
 
 def get_recipes():
     """Get recipes, using cache if available."""
-    global recipes_cache
-    if recipes_cache is None:
-        parser = RecipeParser(DOC_ID, QUICK_RECIPE_DOC_ID)
-        recipes_cache = parser.parse()
-    return recipes_cache
+    return _recipe_data()[0]
 
 
 @app.route('/')
 def index():
     """Main page with recipe dropdown."""
-    recipes = get_recipes()
-    # Sort recipes alphabetically by title
-    recipes = sorted(recipes, key=lambda x: x['title'].lower())
-    return render_template('index.html', recipes=recipes)
+    return render_template('index.html', recipes=_recipe_data()[1])
 
 
 @app.route('/api/recipe/<recipe_title>')
 def get_recipe(recipe_title):
     """Get recipe details by title."""
-    recipes = get_recipes()
-    
     # Find recipe by title (case-insensitive, handle URL encoding)
-    import urllib.parse
-    recipe_title = urllib.parse.unquote(recipe_title)
+    recipe_title = unquote(recipe_title)
     
-    for recipe in recipes:
-        if recipe['title'].lower() == recipe_title.lower():
-            return jsonify(recipe)
+    recipe = _recipe_data()[3].get(recipe_title.lower())
+    if recipe is not None:
+        return jsonify(recipe)
     
     return jsonify({'error': 'Recipe not found'}), 404
 
@@ -68,11 +117,7 @@ def refresh_recipes():
 @app.route('/api/recipes')
 def list_recipes():
     """Get list of all recipe titles."""
-    recipes = get_recipes()
-    # Sort recipes alphabetically by title
-    recipes = sorted(recipes, key=lambda x: x['title'].lower())
-    titles = [recipe['title'] for recipe in recipes]
-    return jsonify(titles)
+    return jsonify(_recipe_data()[2])
 
 
 if __name__ == '__main__':
@@ -4,17 +4,32 @@ Check document permissions and test link extraction.
 """
 
 import creds
-from googleapiclient.discovery import build
+from doc_links import link_url
 from googleapiclient.errors import HttpError
 
+# Only the fields needed to report the title and count links
+DOC_FIELDS = 'title,body/content/paragraph/elements/textRun(content,textStyle/link/url)'
+
+def _iter_links(content):
+    """Yield (url, text_run) for every hyperlinked text run in the document body."""
+    for element in content:
+        if 'paragraph' in element:
+            para = element['paragraph']
+            elements = para.get('elements', ())
+            
+            for elem in elements:
+                text_run = elem.get('textRun')
+                if text_run is None:
+                    continue
+                url = link_url(text_run)
+                if url is not None:
+                    yield url, text_run
+
 def check_document_access(doc_id):
     """Check if we can access the document and see links."""
-    credentials = creds.login()
-    service = build('docs', 'v1', credentials=credentials)
-    
     try:
         print(f"Checking access to document: {doc_id}\n")
-        doc = service.documents().get(documentId=doc_id).execute()
+        doc = creds.get_document(doc_id, fields=DOC_FIELDS)
         
         title = doc.get('title', 'Unknown')
         print(f"✓ Document accessible: {title}\n")
@@ -24,24 +39,13 @@ def check_document_access(doc_id):
         link_count = 0
         external_link_count = 0
         
-        for element in content:
-            if 'paragraph' in element:
-                para = element.get('paragraph', {})
-                elements = para.get('elements', [])
-                
-                for elem in elements:
-                    if 'textRun' in elem:
-                        text_run = elem.get('textRun', {})
-                        if 'link' in text_run:
-                            link = text_run.get('link', {})
-                            if 'url' in link:
-                                link_count += 1
-                                url = link['url']
-                                if 'docs.google.com' not in url:
-                                    external_link_count += 1
-                                    if external_link_count <= 5:  # Show first 5
-                                        text = text_run.get('content', '').strip()
-                                        print(f"  External link found: '{text}' -> {url}")
+        for url, text_run in _iter_links(content):
+            link_count += 1
+            if 'docs.google.com' not in url:
+                external_link_count += 1
+                if external_link_count <= 5:  # Show first 5
+                    text = text_run.get('content', '').strip()
+                    print(f"  External link found: '{text}' -> {url}")
         
         print(f"\nTotal links found: {link_count}")
         print(f"External links: {external_link_count}")
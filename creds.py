@@ -1,8 +1,40 @@
 from google.oauth2.service_account import Credentials
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.model import JsonModel
+import hashlib
+import orjson
 import os
+import random
+import time
 
 credentials = None
 
+# Built API clients, keyed by (name, version)
+services = {}
+
+# Directory holding local copies of fetched Google Docs
+CACHE_DIR = '.cache'
+
+# Drive mimeType of native Google Docs; anything else is rejected by the Docs API
+GOOGLE_DOC_MIME_TYPE = 'application/vnd.google-apps.document'
+
+# Most sub-requests Google accepts in one batch request
+MAX_BATCH_SIZE = 100
+
+# HTTP statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+class UnsupportedDocumentError(Exception):
+    """A Drive file the Docs API can't read (e.g. an uploaded .docx), as found by the metadata probe."""
+
+    def __init__(self, doc_id, mime_type, modified_time):
+        super().__init__(f'Document type not supported by the Docs API: {mime_type}')
+        self.doc_id = doc_id
+        self.mime_type = mime_type
+        self.modified_time = modified_time
+
+
 def login():
     """
     Login to access Google Sheets and Google Drive.
@@ -19,3 +51,216 @@ def login():
             os.environ.get('GOOGLE_SERVICE_ACCOUNT'), 
             scopes=SCOPES)
     return credentials
+
+
+class OrjsonModel(JsonModel):
+    """JsonModel that decodes API responses with orjson instead of the json module."""
+
+    def deserialize(self, content):
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # Let JsonModel deal with anything that isn't valid JSON
+            return super().deserialize(content)
+        if self._data_wrapper and 'data' in body:
+            body = body['data']
+        return body
+
+
+def build_service(name, version):
+    """
+    Build a Google API client that decodes responses with orjson. Clients are
+    built once per process and reused, so the discovery document is only
+    loaded and parsed on the first call.
+    Args:
+        name: API name, e.g. 'docs' or 'drive'.
+        version: API version, e.g. 'v1'.
+    Returns:
+        service: Resource object for the API.
+    """
+    key = (name, version)
+    if key not in services:
+        services[key] = build(name, version, credentials=login(), model=OrjsonModel(),
+                              static_discovery=True, cache_discovery=False)
+    return services[key]
+
+
+def _is_retryable(error):
+    """Whether an API error is a rate-limit or transient server error."""
+    return isinstance(error, HttpError) and error.resp.status in RETRY_STATUSES
+
+
+def execute_with_retry(request, max_attempts=6):
+    """
+    Execute a Google API request, retrying rate-limit (429) and server (5xx)
+    errors with exponential backoff.
+    Args:
+        request: Anything with an execute() method (HttpRequest, BatchHttpRequest).
+        max_attempts: Total number of attempts before the error is raised.
+    Returns:
+        The result of request.execute().
+    """
+    for attempt in range(max_attempts):
+        try:
+            return request.execute()
+        except HttpError as e:
+            if not _is_retryable(e) or attempt == max_attempts - 1:
+                raise
+            # Honor the server's Retry-After (in seconds) if it sent one
+            try:
+                delay = float(e.resp.get('retry-after'))
+            except (TypeError, ValueError):
+                delay = min(60, 2 ** attempt + random.random())
+            time.sleep(delay)
+
+
+def _document_cache_key(doc_id, fields):
+    """Cache key for a Docs API response with the given field mask."""
+    # Different field masks return different payloads, so they are cached separately
+    if fields:
+        return doc_id + '-' + hashlib.md5(fields.encode('utf-8')).hexdigest()[:8]
+    return doc_id
+
+
+def _cache_paths(cache_key):
+    """Return the (data, metadata) cache file paths for a cache key."""
+    return (os.path.join(CACHE_DIR, f'{cache_key}.json'),
+            os.path.join(CACHE_DIR, f'{cache_key}.meta'))
+
+
+def read_cache(cache_key, modified_time):
+    """
+    Return the data cached under cache_key if it is still current, else None.
+    Args:
+        cache_key: File name stem in CACHE_DIR, e.g. '<doc_id>-docx'.
+        modified_time: Drive modifiedTime of the source file.
+    """
+    if not modified_time:
+        return None
+    doc_path, meta_path = _cache_paths(cache_key)
+    try:
+        with open(meta_path, 'r') as f:
+            if f.read().strip() != modified_time:
+                return None
+        with open(doc_path, 'rb') as f:
+            return orjson.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def write_cache(cache_key, modified_time, doc):
+    """Save fetched data under cache_key so later runs can skip the download."""
+    if not modified_time:
+        return
+    doc_path, meta_path = _cache_paths(cache_key)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(doc_path, 'wb') as f:
+            f.write(orjson.dumps(doc))
+        # Written last so an interrupted run never marks a partial copy as fresh
+        with open(meta_path, 'w') as f:
+            f.write(modified_time)
+    except OSError:
+        pass
+
+
+def _batches(doc_ids):
+    """Split doc IDs into lists small enough for one batch request."""
+    doc_ids = list(doc_ids)
+    for start in range(0, len(doc_ids), MAX_BATCH_SIZE):
+        yield doc_ids[start:start + MAX_BATCH_SIZE]
+
+
+def get_documents(fields_by_id):
+    """
+    Get several Google Docs at once. The API calls are sent as batch requests
+    of up to MAX_BATCH_SIZE documents each, and the local copy in CACHE_DIR is reused for
+    any document that has not been modified since it was fetched.
+    Args:
+        fields_by_id: Dict of Google Doc ID -> field mask (or None for the full document).
+    Returns:
+        docs: Dict of doc ID -> document resource.
+        errors: Dict of doc ID -> exception for documents that could not be fetched;
+            files that aren't Google Docs get an UnsupportedDocumentError.
+    """
+    docs = {}
+    errors = {}
+
+    # Cheap freshness probe: Drive metadata requests instead of the full documents.
+    # The mimeType also tells us which files the Docs API can't read (e.g. .docx)
+    modified_times = {}
+
+    def on_modified_time(request_id, response, exception):
+        if exception is None:
+            modified_times[request_id] = response.get('modifiedTime')
+            mime_type = response.get('mimeType')
+            if mime_type and mime_type != GOOGLE_DOC_MIME_TYPE:
+                errors[request_id] = UnsupportedDocumentError(
+                    request_id, mime_type, modified_times[request_id])
+
+    try:
+        drive_service = build_service('drive', 'v3')
+        for batch_ids in _batches(fields_by_id):
+            batch = drive_service.new_batch_http_request(callback=on_modified_time)
+            for doc_id in batch_ids:
+                batch.add(drive_service.files().get(fileId=doc_id, fields='modifiedTime,mimeType'),
+                          request_id=doc_id)
+            execute_with_retry(batch)
+    except HttpError:
+        pass
+
+    for doc_id, fields in fields_by_id.items():
+        if doc_id in errors:
+            continue
+        doc = read_cache(_document_cache_key(doc_id, fields), modified_times.get(doc_id))
+        if doc is not None:
+            docs[doc_id] = doc
+
+    def store(doc_id, doc):
+        docs[doc_id] = doc
+        write_cache(_document_cache_key(doc_id, fields_by_id[doc_id]), modified_times.get(doc_id), doc)
+
+    def on_document(request_id, response, exception):
+        if exception is not None:
+            errors[request_id] = exception
+        else:
+            store(request_id, response)
+
+    stale_ids = [doc_id for doc_id in fields_by_id if doc_id not in docs and doc_id not in errors]
+    if stale_ids:
+        docs_service = build_service('docs', 'v1')
+        for batch_ids in _batches(stale_ids):
+            batch = docs_service.new_batch_http_request(callback=on_document)
+            for doc_id in batch_ids:
+                batch.add(docs_service.documents().get(documentId=doc_id, fields=fields_by_id[doc_id]),
+                          request_id=doc_id)
+            execute_with_retry(batch)
+
+        # Retry documents that were rate limited inside the batch one at a time
+        for doc_id in [doc_id for doc_id, error in errors.items() if _is_retryable(error)]:
+            try:
+                doc = execute_with_retry(docs_service.documents().get(
+                    documentId=doc_id, fields=fields_by_id[doc_id]))
+            except HttpError as e:
+                errors[doc_id] = e
+                continue
+            del errors[doc_id]
+            store(doc_id, doc)
+
+    return docs, errors
+
+
+def get_document(doc_id, fields=None):
+    """
+    Get a Google Doc, reusing the local copy in CACHE_DIR if the document
+    has not been modified since it was fetched.
+    Args:
+        doc_id: Google Doc ID.
+        fields: Optional field mask passed to documents().get().
+    Returns:
+        doc: Document resource as a dict.
+    """
+    docs, errors = get_documents({doc_id: fields})
+    if doc_id in errors:
+        raise errors[doc_id]
+    return docs[doc_id]
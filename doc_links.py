@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+"""
+Read hyperlinks out of Google Docs text runs.
+"""
+
+# Shared read-only stand-in for a missing textStyle
+_EMPTY = {}
+
+
+def link_url(text_run):
+    """Return the URL a text run links to, or None if it isn't a link."""
+    # Links can be in textRun.link OR textStyle.link
+    link = text_run.get('link') or text_run.get('textStyle', _EMPTY).get('link')
+    if link:
+        return link.get('url')
+    return None
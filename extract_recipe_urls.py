@@ -5,18 +5,17 @@ This script looks for hyperlinks on the word "Recipe" and associates them with r
 """
 
 import creds
-from googleapiclient.discovery import build
-import json
-import re
-import os
+from doc_links import link_url
+from json_files import read_json, write_json
+from quick_recipe_parser import TITLE_RE, STANDALONE_MARKERS
+
+# Only the paragraph text and link fields are needed to find recipe URLs
+DOC_FIELDS = 'body/content/paragraph/elements/textRun(content,textStyle/link/url)'
 
 def extract_recipe_urls(doc_id, recipe_urls_file='recipe_urls.json'):
     """Extract all recipe URLs from the document."""
-    credentials = creds.login()
-    service = build('docs', 'v1', credentials=credentials)
-    
     try:
-        doc = service.documents().get(documentId=doc_id).execute()
+        doc = creds.get_document(doc_id, fields=DOC_FIELDS)
         content = doc.get('body', {}).get('content', [])
         
         recipes_with_urls = {}
@@ -25,49 +24,35 @@ def extract_recipe_urls(doc_id, recipe_urls_file='recipe_urls.json'):
         
         for element in content:
             if 'paragraph' in element:
-                para = element.get('paragraph', {})
-                elements = para.get('elements', [])
-                paragraph_text = ''
+                para = element['paragraph']
+                elements = para.get('elements', ())
+                text_parts = []
                 found_recipe_link = None
                 
-                # First pass: collect text and find recipe title
+                # Single pass: collect text and look for links
                 for elem in elements:
-                    if 'textRun' in elem:
-                        text_run = elem.get('textRun', {})
-                        content_text = text_run.get('content', '')
-                        paragraph_text += content_text
+                    text_run = elem.get('textRun')
+                    if text_run is None:
+                        continue
+                    content_text = text_run.get('content', '')
+                    text_parts.append(content_text)
+                    
+                    # Check for links, skipping Google Doc URLs
+                    url = link_url(text_run)
+                    if url is not None and 'docs.google.com' not in url:
+                        # If this link is on "Recipe" text, save it
+                        if 'recipe' in content_text.lower():
+                            found_recipe_link = url
                 
-                line = paragraph_text.strip()
+                line = ''.join(text_parts).strip()
                 line_lower = line.lower()
                 
-                # Second pass: look for links and recipe titles
-                for elem in elements:
-                    if 'textRun' in elem:
-                        text_run = elem.get('textRun', {})
-                        content_text = text_run.get('content', '').strip()
-                        
-                        # Check for links
-                        if 'link' in text_run:
-                            link = text_run.get('link', {})
-                            if 'url' in link:
-                                url = link['url']
-                                # Skip Google Doc URLs
-                                if 'docs.google.com' not in url:
-                                    # If this link is on "Recipe" text, save it
-                                    if 'recipe' in content_text.lower():
-                                        found_recipe_link = url
-                
-                # Detect recipe title
-                if ' recipe' in line_lower or ' quick_recipe' in line_lower:
-                    if line_lower.strip() not in ['recipe', 'quick_recipe', 'quick recipe']:
+                # Detect recipe title (only lines mentioning "recipe" can match)
+                title_match = TITLE_RE.match(line) if 'recipe' in line_lower else None
+                if title_match:
+                    if line_lower not in STANDALONE_MARKERS:
                         # Extract recipe title
-                        title = line
-                        if ' recipe' in line_lower:
-                            title = line[:line_lower.index(' recipe')].strip()
-                        elif ' quick_recipe' in line_lower:
-                            title = line[:line_lower.index(' quick_recipe')].strip()
-                        elif ' quick recipe' in line_lower:
-                            title = line[:line_lower.index(' quick recipe')].strip()
+                        title = title_match.group(title_match.lastindex).strip()
                         
                         current_recipe_title = title
                         
@@ -78,7 +63,7 @@ def extract_recipe_urls(doc_id, recipe_urls_file='recipe_urls.json'):
                             pending_url = None
                 
                 # Check for standalone "Recipe" line
-                elif current_recipe_title and line_lower.strip() == 'recipe':
+                elif current_recipe_title and line_lower == 'recipe':
                     if found_recipe_link:
                         recipes_with_urls[current_recipe_title] = found_recipe_link
                         print(f"Found: {current_recipe_title} -> {found_recipe_link}")
@@ -94,10 +79,9 @@ def extract_recipe_urls(doc_id, recipe_urls_file='recipe_urls.json'):
                     pending_url = found_recipe_link
         
         # Load existing recipe_urls.json
-        if os.path.exists(recipe_urls_file):
-            with open(recipe_urls_file, 'r') as f:
-                all_recipes = json.load(f)
-        else:
+        try:
+            all_recipes = read_json(recipe_urls_file)
+        except FileNotFoundError:
             all_recipes = {}
         
         # Update with found URLs (only if they don't already exist or are empty)
@@ -112,8 +96,7 @@ def extract_recipe_urls(doc_id, recipe_urls_file='recipe_urls.json'):
                 updated_count += 1
         
         # Write back
-        with open(recipe_urls_file, 'w') as f:
-            json.dump(all_recipes, f, indent=2)
+        write_json(recipe_urls_file, all_recipes)
         
         print(f"\nUpdated {updated_count} recipes in {recipe_urls_file}")
         print(f"Total recipes with URLs: {sum(1 for v in all_recipes.values() if v)}")
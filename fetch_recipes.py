@@ -1,11 +1,12 @@
 #!/usr/bin/env python3
 """
-Fetch recipes from Google Docs and output to data/recipes.json.
+Fetch recipes from Google Docs and output to data/recipes.json
+(plus data/recipes.ndjson, one recipe per line, for streaming consumers).
 Used by GitHub Actions to update the static site.
 """
-import json
 import os
 import sys
+from json_files import write_json, write_ndjson
 
 # Document IDs (same as app.py)
 DOC_ID = '1ZKRBHoqKoQQ7RcnHoNtLtx0O0ae7ZMHF_XF1UUNp2kY'
@@ -23,8 +24,8 @@ def main():
     recipes = sorted(recipes, key=lambda x: x['title'].lower())
 
     os.makedirs('data', exist_ok=True)
-    with open('data/recipes.json', 'w', encoding='utf-8') as f:
-        json.dump(recipes, f, indent=2, ensure_ascii=False)
+    write_json('data/recipes.json', recipes)
+    write_ndjson('data/recipes.ndjson', recipes)
 
     print(f'Wrote {len(recipes)} recipes to data/recipes.json')
 
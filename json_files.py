@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Read and write the JSON data files (recipe_urls.json, data/recipes.json,
+data/recipes.ndjson).
+"""
+
+import orjson
+import os
+
+
+def read_json(path):
+    """Load a JSON file in one read."""
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+def write_json(path, obj):
+    """
+    Write obj to path as indented UTF-8 JSON.
+    The data is serialized up front and written with a single write() to a
+    temporary file, which then replaces path, so an interrupted run never
+    leaves a half-written file behind.
+    """
+    data = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def write_ndjson(path, items):
+    """
+    Write items to path as newline-delimited JSON (one compact object per line),
+    so consumers can stream records instead of loading one big array.
+    Replaces path atomically, like write_json.
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb', buffering=1024 * 1024) as f:
+        for item in items:
+            f.write(orjson.dumps(item, option=orjson.OPT_APPEND_NEWLINE))
+    os.replace(tmp_path, path)
@@ -4,10 +4,27 @@ Parse Quick Recipe document to extract quick recipe information.
 """
 
 import creds
-from googleapiclient.discovery import build
 import re
 from typing import Dict, List
 
+# Only the fields the parser reads: paragraph text, strikethrough and bullets
+DOC_FIELDS = ('body/content/paragraph(elements/textRun(content,textStyle/strikethrough),'
+              'bullet(listId,nestingLevel))')
+
+# Recipe title line: captures the text before the first " Recipe", or failing
+# that before the first " Quick_Recipe" (" Quick Recipe" contains " Recipe").
+# Also used by extract_recipe_urls
+TITLE_RE = re.compile(r'(.*?) recipe|(.*?) quick_recipe', re.IGNORECASE | re.DOTALL)
+
+# Lines that are only a section marker, never a title (used by all the parsers)
+STANDALONE_MARKERS = frozenset(['recipe', 'quick_recipe', 'quick recipe'])
+
+# Cooking-instruction keywords ('oven:', 'degrees', 'deg', 'min', 'minutes');
+# 'deg' and 'min' already cover 'degrees' and 'minutes'
+_CONTENT_KEYWORDS_RE = re.compile(r'oven:|deg|min')
+
+_STARTS_WITH_DIGIT_RE = re.compile(r'\d')
+
 
 class QuickRecipeParser:
     """Parse quick recipes from Google Docs."""
@@ -17,89 +34,88 @@ class QuickRecipeParser:
         self.quick_recipes = {}  # title -> quick_recipe_text
     
     def parse(self) -> Dict[str, str]:
-        """Parse the document and return dict of recipe title -> quick recipe text."""
-        credentials = creds.login()
-        service = build('docs', 'v1', credentials=credentials)
-        
+        """Fetch and parse the document and return dict of recipe title -> quick recipe text."""
         try:
-            doc = service.documents().get(documentId=self.doc_id).execute()
-            content = doc.get('body', {}).get('content', [])
-            
-            current_recipe_title = None
-            quick_recipe_lines = []
-            
-            for element in content:
-                if 'paragraph' in element:
-                    para = element.get('paragraph', {})
-                    elements = para.get('elements', [])
-                    paragraph_text = ''
+            doc = creds.get_document(self.doc_id, fields=DOC_FIELDS)
+        except Exception as e:
+            # Silently fail - document might not be shared yet
+            # Error will be: HttpError 403 - permission denied
+            return {}
+        return self.parse_document(doc)
+    
+    def parse_document(self, doc: Dict) -> Dict[str, str]:
+        """Parse an already-fetched document and return dict of recipe title -> quick recipe text."""
+        content = doc.get('body', {}).get('content', [])
+        
+        current_recipe_title = None
+        quick_recipe_lines = []
+        
+        for element in content:
+            if 'paragraph' in element:
+                para = element['paragraph']
+                elements = para.get('elements', ())
+                text_parts = []
+                
+                for elem in elements:
+                    try:
+                        text_run = elem['textRun']
+                    except KeyError:
+                        continue
+                    text_style = text_run.get('textStyle')
+                    if not (text_style and text_style.get('strikethrough')):
+                        text_parts.append(text_run.get('content', ''))
+                
+                paragraph_text = ''.join(text_parts)
+                if paragraph_text.strip():
+                    line = paragraph_text.strip()
                     
-                    for elem in elements:
-                        if 'textRun' in elem:
-                            text_run = elem.get('textRun', {})
-                            content_text = text_run.get('content', '')
-                            text_style = text_run.get('textStyle', {})
-                            
-                            if not text_style.get('strikethrough', False):
-                                paragraph_text += content_text
+                    # Preserve bullet/indent formatting
+                    bullet = para.get('bullet')
+                    if bullet is not None:
+                        nesting = bullet.get('nestingLevel', 0)
+                        indent = '  ' * nesting
+                        line = f'{indent}- {line}'
                     
-                    if paragraph_text.strip():
-                        line = paragraph_text.strip()
-                        line_lower = line.lower()
+                    # Detect recipe title (similar to main parser)
+                    if self._is_recipe_title(line) and not bullet:
+                        # Save previous recipe
+                        if current_recipe_title and quick_recipe_lines:
+                            self.quick_recipes[current_recipe_title] = '\n'.join(quick_recipe_lines)
                         
-                        # Preserve bullet/indent formatting
-                        bullet = para.get('bullet')
-                        if bullet is not None:
-                            nesting = bullet.get('nestingLevel', 0)
-                            indent = '  ' * nesting
-                            line = f'{indent}- {line}'
+                        # Extract recipe title (strip bullet prefix if we added it)
+                        title = paragraph_text.strip()
+                        # Remove common suffixes
+                        title_match = TITLE_RE.match(title)
+                        if title_match:
+                            title = title_match.group(title_match.lastindex).strip()
                         
-                        # Detect recipe title (similar to main parser)
-                        if self._is_recipe_title(line) and not bullet:
-                            # Save previous recipe
-                            if current_recipe_title and quick_recipe_lines:
-                                self.quick_recipes[current_recipe_title] = '\n'.join(quick_recipe_lines)
-                            
-                            # Extract recipe title (strip bullet prefix if we added it)
-                            title = paragraph_text.strip()
-                            # Remove common suffixes
-                            for suffix in [' recipe', ' quick_recipe', ' quick recipe']:
-                                if suffix in line_lower:
-                                    title = title[:line_lower.index(suffix)].strip()
-                                    break
-                            
-                            current_recipe_title = title
-                            quick_recipe_lines = []
-                        elif current_recipe_title:
-                            # This is content for the current recipe
-                            quick_recipe_lines.append(line)
-            
-            # Save last recipe
-            if current_recipe_title and quick_recipe_lines:
-                self.quick_recipes[current_recipe_title] = '\n'.join(quick_recipe_lines)
-            
-            return self.quick_recipes
+                        current_recipe_title = title
+                        quick_recipe_lines = []
+                    elif current_recipe_title:
+                        # This is content for the current recipe
+                        quick_recipe_lines.append(line)
         
-        except Exception as e:
-            # Silently fail - document might not be shared yet
-            # Error will be: HttpError 403 - permission denied
-            return {}
+        # Save last recipe
+        if current_recipe_title and quick_recipe_lines:
+            self.quick_recipes[current_recipe_title] = '\n'.join(quick_recipe_lines)
+        
+        return self.quick_recipes
     
     def _is_recipe_title(self, line: str) -> bool:
         """Determine if a line is a recipe title."""
         line_lower = line.lower()
         
         # Pattern: Recipe name followed by "Recipe" or "Quick_Recipe"
-        if ' recipe' in line_lower or ' quick_recipe' in line_lower or ' quick recipe' in line_lower:
-            if line_lower.strip() not in ['recipe', 'quick_recipe', 'quick recipe']:
-                return True
+        if ('recipe' in line_lower and TITLE_RE.match(line)
+                and line_lower.strip() not in STANDALONE_MARKERS):
+            return True
         
         # Not a title if it's clearly content
-        if any(keyword in line_lower for keyword in ['oven:', 'degrees', 'deg', 'min', 'minutes']):
+        if _CONTENT_KEYWORDS_RE.search(line_lower):
             return False
         
         # Not a title if it starts with a number
-        if re.match(r'^\d+', line):
+        if _STARTS_WITH_DIGIT_RE.match(line):
             return False
         
         # Short lines that aren't instructions might be titles
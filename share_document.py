@@ -4,9 +4,15 @@ Helper script to get the service account email for sharing Google Docs/Sheets.
 """
 
 import creds
-import json
+import functools
 import os
 import sys
+from json_files import read_json
+
+@functools.lru_cache(maxsize=1)
+def _read_client_email(service_account_file, mtime_ns):
+    """Read client_email from the service account file (cached until the file changes)."""
+    return read_json(service_account_file).get('client_email')
 
 def get_service_account_email():
     """Get the service account email from credentials."""
@@ -17,14 +23,12 @@ def get_service_account_email():
         return None
     
     try:
-        with open(service_account_file, 'r') as f:
-            creds_data = json.load(f)
-            service_account_email = creds_data.get('client_email')
-            return service_account_email
+        mtime_ns = os.stat(service_account_file).st_mtime_ns
+        return _read_client_email(service_account_file, mtime_ns)
     except FileNotFoundError:
         print(f"ERROR: Service account file not found: {service_account_file}")
         return None
-    except json.JSONDecodeError:
+    except ValueError:
         print(f"ERROR: Invalid JSON in service account file: {service_account_file}")
         return None
     except Exception as e: